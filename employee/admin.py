@@ -1,18 +1,54 @@
 from django.contrib import admin
+from django.db.models import Count, Q
 from django.utils.html import format_html
 from .models import Employee, Department, Position, EmployeeDocument, Attendance, LeaveRequest
 
 
+def _status_badge(color, label):
+    return format_html(
+        '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
+        color,
+        label
+    )
+
+
+def _build_badges(choices, colors):
+    """Render every status badge once so changelist rows only do a dict lookup"""
+    return {value: _status_badge(colors.get(value, 'gray'), label) for value, label in choices}
+
+
+EMPLOYEE_STATUS_BADGES = _build_badges(Employee.STATUS_CHOICES, {
+    'active': 'green',
+    'on_leave': 'orange',
+    'terminated': 'red',
+    'resigned': 'gray'
+})
+
+LEAVE_STATUS_BADGES = _build_badges(LeaveRequest.STATUS_CHOICES, {
+    'pending': 'orange',
+    'approved': 'green',
+    'rejected': 'red',
+    'cancelled': 'gray'
+})
+
+
 @admin.register(Department)
 class DepartmentAdmin(admin.ModelAdmin):
     list_display = ['name', 'code', 'manager', 'employee_count', 'is_active', 'created_at']
+    list_select_related = ['manager']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'code', 'description']
     readonly_fields = ['created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _active_emp=Count('employees', filter=Q(employees__status='active'))
+        )
+    
     def employee_count(self, obj):
-        return obj.employees.filter(status='active').count()
+        return obj._active_emp
     employee_count.short_description = 'Active Employees'
+    employee_count.admin_order_field = '_active_emp'
 
 
 @admin.register(Position)
@@ -22,9 +58,15 @@ class PositionAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description']
     readonly_fields = ['created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            _active_emp=Count('employees', filter=Q(employees__status='active'))
+        )
+    
     def employee_count(self, obj):
-        return obj.employees.filter(status='active').count()
+        return obj._active_emp
     employee_count.short_description = 'Active Employees'
+    employee_count.admin_order_field = '_active_emp'
 
 
 @admin.register(Employee)
@@ -59,17 +101,10 @@ class EmployeeAdmin(admin.ModelAdmin):
     )
     
     def status_badge(self, obj):
-        colors = {
-            'active': 'green',
-            'on_leave': 'orange',
-            'terminated': 'red',
-            'resigned': 'gray'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.status, 'gray'),
-            obj.get_status_display()
-        )
+        badge = EMPLOYEE_STATUS_BADGES.get(obj.status)
+        if badge is None:
+            badge = _status_badge('gray', obj.get_status_display())
+        return badge
     status_badge.short_description = 'Status'
     
     def save_model(self, request, obj, form, change):
@@ -81,6 +116,7 @@ class EmployeeAdmin(admin.ModelAdmin):
 @admin.register(EmployeeDocument)
 class EmployeeDocumentAdmin(admin.ModelAdmin):
     list_display = ['title', 'employee', 'document_type', 'uploaded_by', 'uploaded_at']
+    list_select_related = ['employee', 'uploaded_by']
     list_filter = ['document_type', 'uploaded_at']
     search_fields = ['title', 'employee__first_name', 'employee__last_name']
     readonly_fields = ['uploaded_at']
@@ -94,6 +130,7 @@ class EmployeeDocumentAdmin(admin.ModelAdmin):
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ['employee', 'date', 'check_in', 'check_out', 'status', 'created_at']
+    list_select_related = ['employee']
     list_filter = ['status', 'date', 'created_at']
     search_fields = ['employee__first_name', 'employee__last_name', 'employee__employee_id']
     date_hierarchy = 'date'
@@ -103,6 +140,8 @@ class AttendanceAdmin(admin.ModelAdmin):
 @admin.register(LeaveRequest)
 class LeaveRequestAdmin(admin.ModelAdmin):
     list_display = ['employee', 'leave_type', 'start_date', 'end_date', 'total_days', 'status_badge', 'created_at']
+    # The rows only render the employee, not the employee's own relations
+    list_select_related = ['employee']
     list_filter = ['status', 'leave_type', 'start_date', 'created_at']
     search_fields = ['employee__first_name', 'employee__last_name', 'reason']
     readonly_fields = ['created_at', 'updated_at', 'total_days']
@@ -122,17 +161,10 @@ class LeaveRequestAdmin(admin.ModelAdmin):
     )
     
     def status_badge(self, obj):
-        colors = {
-            'pending': 'orange',
-            'approved': 'green',
-            'rejected': 'red',
-            'cancelled': 'gray'
-        }
-        return format_html(
-            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
-            colors.get(obj.status, 'gray'),
-            obj.get_status_display()
-        )
+        badge = LEAVE_STATUS_BADGES.get(obj.status)
+        if badge is None:
+            badge = _status_badge('gray', obj.get_status_display())
+        return badge
     status_badge.short_description = 'Status'
     
     def save_model(self, request, obj, form, change):
@@ -3,9 +3,12 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from django_auto_prefetching import AutoPrefetchViewSetMixin
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from django.core.files.storage import default_storage
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
-from datetime import timedelta
 
 from .models import Employee, Department, Position, EmployeeDocument, Attendance, LeaveRequest
 from .serializers import (
@@ -14,25 +17,46 @@ from .serializers import (
     AttendanceSerializer, LeaveRequestSerializer, DashboardStatsSerializer
 )
 from .permissions import IsHROrReadOnly, IsManagerOrHR
+from .pagination import StandardResultsSetPagination, AnnotationFreePagination
+from .tasks import export_employees_xlsx
+from .cache import get_dashboard_stats, invalidate_dashboard_stats
+
+
+# Employee list orderings that need Employee.objects.with_derived()
+DERIVED_ORDERING_FIELDS = {'age', 'years_of_service'}
 
 
 class DepartmentViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Department CRUD operations
     """
-    queryset = Department.objects.all()
+    queryset = Department.objects.select_related('manager').annotate(
+        active_employee_count=Count('employees', filter=Q(employees__status='active'))
+    ).only(
+        'id', 'name', 'code', 'description', 'is_active', 'created_at', 'updated_at',
+        'manager__first_name', 'manager__last_name'
+    )
     serializer_class = DepartmentSerializer
     permission_classes = [IsAuthenticated, IsHROrReadOnly]
+    pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['name', 'code', 'created_at']
     ordering = ['name']
     
+    def get_queryset(self):
+        """Skip the manager join and counts when only the department row is needed"""
+        if self.action == 'employees':
+            return Department.objects.all()
+        return super().get_queryset()
+    
     @action(detail=True, methods=['get'])
     def employees(self, request, pk=None):
         """Get all employees in a department"""
         department = self.get_object()
-        employees = department.employees.filter(status='active')
+        employees = EmployeeListSerializer.setup_eager_loading(
+            department.employees.filter(status='active')
+        )
         serializer = EmployeeListSerializer(employees, many=True)
         return Response(serializer.data)
 
@@ -41,26 +65,68 @@ class PositionViewSet(viewsets.ModelViewSet):
     """
     ViewSet for Position CRUD operations
     """
-    queryset = Position.objects.all()
+    queryset = Position.objects.annotate(
+        active_employee_count=Count('employees', filter=Q(employees__status='active'))
+    )
     serializer_class = PositionSerializer
     permission_classes = [IsAuthenticated, IsHROrReadOnly]
+    pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['title', 'min_salary', 'max_salary']
     ordering = ['title']
 
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Employee CRUD operations with advanced filtering
     """
-    queryset = Employee.objects.select_related('department', 'position', 'manager').all()
+    queryset = Employee.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = AnnotationFreePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['department', 'position', 'status', 'employment_type', 'gender']
     search_fields = ['employee_id', 'first_name', 'last_name', 'email', 'phone']
-    ordering_fields = ['employee_id', 'first_name', 'last_name', 'date_joined', 'salary']
+    ordering_fields = ['employee_id', 'first_name', 'last_name', 'date_joined', 'salary',
+                       'age', 'years_of_service']
     ordering = ['employee_id']
+    # Rendered as primary keys, which come from the foreign key columns
+    auto_prefetch_excluded_fields = {'user', 'created_by'}
+    
+    def get_auto_prefetch_extra_select_fields(self):
+        # manager_name is a method field, which auto prefetching cannot see;
+        # the list serializer prefetches managers itself
+        if self.action == 'list':
+            return set()
+        return {'manager'}
+    
+    def get_queryset(self):
+        """Shape the queryset for the serializer used by the current action"""
+        if self.action == 'subordinates':
+            # get_object() only needs the employee row to look up the subordinates
+            return self.get_prefetchable_queryset()
+        queryset = super().get_queryset()
+        if self.action in ['retrieve', 'terminate']:
+            queryset = queryset.annotate(
+                active_subordinate_count=Count('subordinates', filter=Q(subordinates__status='active'))
+            )
+        elif self.action == 'list':
+            queryset = EmployeeListSerializer.setup_eager_loading(queryset)
+        # Only the list and export orderings can sort by these
+        if self.action in ['list', 'export']:
+            ordering = self.request.query_params.get('ordering', '')
+            if DERIVED_ORDERING_FIELDS & {term.strip().lstrip('-') for term in ordering.split(',')}:
+                queryset = queryset.with_derived()
+        return queryset
+    
+    def filter_queryset(self, queryset):
+        """Apply OrderingFilter to list and export only; object lookups never need it"""
+        backends = self.filter_backends
+        if self.action not in ['list', 'export']:
+            backends = [backend for backend in backends if backend is not filters.OrderingFilter]
+        for backend in backends:
+            queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -77,51 +143,16 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get dashboard statistics"""
-        total_employees = Employee.objects.count()
-        active_employees = Employee.objects.filter(status='active').count()
-        on_leave = Employee.objects.filter(status='on_leave').count()
-        total_departments = Department.objects.filter(is_active=True).count()
-        pending_leave_requests = LeaveRequest.objects.filter(status='pending').count()
-        
-        # Employees by department
-        employees_by_dept = dict(
-            Department.objects.filter(is_active=True).annotate(
-                count=Count('employees', filter=Q(employees__status='active'))
-            ).values_list('name', 'count')
-        )
-        
-        # Employees by employment type
-        employees_by_type = dict(
-            Employee.objects.filter(status='active').values('employment_type').annotate(
-                count=Count('id')
-            ).values_list('employment_type', 'count')
-        )
-        
-        # Recent hires (last 30 days)
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
-        recent_hires = Employee.objects.filter(
-            date_joined__gte=thirty_days_ago
-        ).values('employee_id', 'first_name', 'last_name', 'date_joined')[:10]
-        
-        stats = {
-            'total_employees': total_employees,
-            'active_employees': active_employees,
-            'on_leave': on_leave,
-            'total_departments': total_departments,
-            'pending_leave_requests': pending_leave_requests,
-            'employees_by_department': employees_by_dept,
-            'employees_by_employment_type': employees_by_type,
-            'recent_hires': list(recent_hires),
-        }
-        
-        serializer = DashboardStatsSerializer(stats)
+        serializer = DashboardStatsSerializer(get_dashboard_stats())
         return Response(serializer.data)
     
     @action(detail=True, methods=['get'])
     def subordinates(self, request, pk=None):
         """Get all subordinates of an employee"""
         employee = self.get_object()
-        subordinates = employee.subordinates.filter(status='active')
+        subordinates = EmployeeListSerializer.setup_eager_loading(
+            employee.subordinates.filter(status='active')
+        )
         serializer = EmployeeListSerializer(subordinates, many=True)
         return Response(serializer.data)
     
@@ -135,56 +166,44 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         employee.status = 'terminated'
         employee.date_left = date_left
         employee.notes = f"{employee.notes}\n\nTermination Date: {date_left}\nReason: {reason}"
-        employee.save()
+        employee.save(update_fields=['status', 'date_left', 'notes', 'updated_at'])
         
         serializer = self.get_serializer(employee)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def export(self, request):
-        """Export employees to Excel"""
-        from openpyxl import Workbook
-        from django.http import HttpResponse
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Employees"
+        """Start a background Excel export of the filtered employees"""
+        task = export_employees_xlsx.delay(request.user.id, request.query_params.urlencode())
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
+    
+    @extend_schema(parameters=[OpenApiParameter('task_id', str, OpenApiParameter.PATH)])
+    @action(detail=False, methods=['get'], url_path=r'export/status/(?P<task_id>[^/.]+)')
+    def export_status(self, request, task_id=None):
+        """Get the state of an export and its download URL once finished"""
+        from celery.result import AsyncResult
         
-        # Headers
-        headers = ['Employee ID', 'First Name', 'Last Name', 'Email', 'Phone', 
-                   'Department', 'Position', 'Status', 'Date Joined']
-        ws.append(headers)
+        result = AsyncResult(task_id)
+        data = {'task_id': task_id, 'status': result.status}
+        if not result.successful():
+            return Response(data)
         
-        # Data
-        employees = self.filter_queryset(self.get_queryset())
-        for emp in employees:
-            ws.append([
-                emp.employee_id,
-                emp.first_name,
-                emp.last_name,
-                emp.email,
-                emp.phone,
-                emp.department.name,
-                emp.position.title,
-                emp.get_status_display(),
-                emp.date_joined.strftime('%Y-%m-%d') if emp.date_joined else ''
-            ])
+        export = result.result
+        if export['user_id'] != request.user.id:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename=employees.xlsx'
-        wb.save(response)
-        return response
+        data['url'] = request.build_absolute_uri(default_storage.url(export['file']))
+        return Response(data)
 
 
-class EmployeeDocumentViewSet(viewsets.ModelViewSet):
+class EmployeeDocumentViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Employee Documents
     """
-    queryset = EmployeeDocument.objects.select_related('employee', 'uploaded_by').all()
+    queryset = EmployeeDocument.objects.all()
     serializer_class = EmployeeDocumentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['employee', 'document_type']
     search_fields = ['title', 'employee__first_name', 'employee__last_name']
@@ -201,6 +220,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     queryset = Attendance.objects.select_related('employee').all()
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['employee', 'date', 'status']
     ordering_fields = ['date', 'check_in', 'check_out']
@@ -219,26 +239,30 @@ class AttendanceViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        attendance_records = []
-        for emp_id in employee_ids:
-            attendance, created = Attendance.objects.update_or_create(
-                employee_id=emp_id,
-                date=date,
-                defaults={'status': status_value}
-            )
-            attendance_records.append(attendance)
+        records = [
+            Attendance(employee_id=emp_id, date=date, status=status_value)
+            for emp_id in employee_ids
+        ]
+        with transaction.atomic():
+            Attendance.objects.bulk_upsert(records, update_fields=['status', 'updated_at'])
         
+        # Upserted rows don't get their primary keys back on every backend
+        attendance_records = Attendance.objects.select_related('employee').filter(
+            employee_id__in=employee_ids,
+            date=date
+        )
         serializer = self.get_serializer(attendance_records, many=True)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class LeaveRequestViewSet(viewsets.ModelViewSet):
+class LeaveRequestViewSet(AutoPrefetchViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Leave Requests
     """
-    queryset = LeaveRequest.objects.select_related('employee', 'approved_by').all()
+    queryset = LeaveRequest.objects.all()
     serializer_class = LeaveRequestSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['employee', 'leave_type', 'status']
     ordering_fields = ['start_date', 'created_at']
@@ -246,7 +270,13 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter leave requests based on user role"""
-        queryset = super().get_queryset()
+        if self.action in ['approve', 'reject']:
+            # The permission check only needs the row; the response is loaded after the update
+            queryset = self.get_prefetchable_queryset()
+        else:
+            queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = LeaveRequestSerializer.setup_eager_loading(queryset)
         user = self.request.user
         
         # If user has employee profile, show their requests
@@ -258,39 +288,53 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve a leave request"""
+        now = timezone.now()
+        # Object permissions are checked before anything is written
         leave_request = self.get_object()
+        # Conditional UPDATE so two concurrent decisions can't both succeed
+        updated = LeaveRequest.objects.filter(pk=leave_request.pk, status='pending').update(
+            status='approved',
+            approved_by=request.user,
+            approval_date=now,
+            updated_at=now
+        )
         
-        if leave_request.status != 'pending':
+        if not updated:
             return Response(
                 {'error': 'Only pending requests can be approved'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        leave_request.status = 'approved'
-        leave_request.approved_by = request.user
-        leave_request.approval_date = timezone.now()
-        leave_request.save()
-        
+        # update() skips the post_save handlers that clear the dashboard counters
+        invalidate_dashboard_stats()
+        leave_request = LeaveRequestSerializer.setup_eager_loading(LeaveRequest.objects.all()).get(pk=leave_request.pk)
         serializer = self.get_serializer(leave_request)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def reject(self, request, pk=None):
         """Reject a leave request"""
+        rejection_reason = request.data.get('rejection_reason', '')
+        now = timezone.now()
+        # Object permissions are checked before anything is written
         leave_request = self.get_object()
+        # Conditional UPDATE so two concurrent decisions can't both succeed
+        updated = LeaveRequest.objects.filter(pk=leave_request.pk, status='pending').update(
+            status='rejected',
+            approved_by=request.user,
+            approval_date=now,
+            rejection_reason=rejection_reason,
+            updated_at=now
+        )
         
-        if leave_request.status != 'pending':
+        if not updated:
             return Response(
                 {'error': 'Only pending requests can be rejected'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        rejection_reason = request.data.get('rejection_reason', '')
-        leave_request.status = 'rejected'
-        leave_request.approved_by = request.user
-        leave_request.approval_date = timezone.now()
-        leave_request.rejection_reason = rejection_reason
-        leave_request.save()
-        
+        # update() skips the post_save handlers that clear the dashboard counters
+        invalidate_dashboard_stats()
+        leave_request = LeaveRequestSerializer.setup_eager_loading(LeaveRequest.objects.all()).get(pk=leave_request.pk)
         serializer = self.get_serializer(leave_request)
         return Response(serializer.data)
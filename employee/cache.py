@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import connection
+from django.db.models import Q, Count
+from django.utils import timezone
+
+from .models import Employee, Department, DepartmentEmployeeCount, LeaveRequest, active_employee_count
+
+
+APPROX_COUNT_THRESHOLD = 100000
+
+DASHBOARD_STATS_CACHE_KEY = 'dashboard_stats'
+DASHBOARD_STATS_TIMEOUT = 60
+# {% cache %} fragments in dashboard.html holding the rendered stats
+DASHBOARD_FRAGMENTS = ['dashboard_stats', 'dashboard_recent_hires']
+
+
+def approx_count(model):
+    """Return PostgreSQL's row estimate for large tables, None if an exact count is needed"""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+            [model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < APPROX_COUNT_THRESHOLD:
+        return None
+    return row[0]
+
+
+def employees_by_department():
+    """(name, active employee count) for each active department, by name"""
+    if connection.vendor == 'postgresql':
+        # Pre-aggregated by the employees_by_dept_mv materialized view, refreshed in the
+        # background after employee and department writes (tasks.queue_employees_by_dept_refresh)
+        # and by the beat schedule, so these counts briefly lag the tables
+        return DepartmentEmployeeCount.objects.order_by('name').values_list('name', 'count')
+    return Department.objects.filter(is_active=True).annotate(
+        count=active_employee_count('department')
+    ).order_by('name').values_list('name', 'count')
+
+
+def compute_dashboard_stats():
+    """Counters and breakdowns shared by the HTML dashboard and the dashboard_stats API"""
+    # Employee counters in a single conditional aggregate
+    total_employees = approx_count(Employee)
+    if total_employees is None:
+        employee_counts = Employee.objects.aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+            on_leave=Count('id', filter=Q(status='on_leave')),
+        )
+        total_employees = employee_counts['total']
+    else:
+        # Only the status counters are left, which the status index can serve
+        employee_counts = Employee.objects.filter(
+            status__in=['active', 'on_leave']
+        ).aggregate(
+            active=Count('id', filter=Q(status='active')),
+            on_leave=Count('id', filter=Q(status='on_leave')),
+        )
+    
+    by_department = dict(employees_by_department())
+    
+    by_employment_type = dict(
+        Employee.objects.filter(status='active').values('employment_type').annotate(
+            count=Count('id')
+        ).values_list('employment_type', 'count')
+    )
+    
+    # Recent active hires (last 30 days), read off the (status, -date_joined) index
+    thirty_days_ago = timezone.now().date() - timedelta(days=30)
+    recent_hires = Employee.objects.filter(
+        status='active', date_joined__gte=thirty_days_ago
+    ).order_by('-date_joined').values('employee_id', 'first_name', 'last_name', 'date_joined')[:10]
+    
+    return {
+        'total_employees': total_employees,
+        'active_employees': employee_counts['active'],
+        'on_leave': employee_counts['on_leave'],
+        'total_departments': Department.objects.filter(is_active=True).count(),
+        'pending_leave_requests': LeaveRequest.objects.filter(status='pending').count(),
+        'employees_by_department': by_department,
+        'employees_by_employment_type': by_employment_type,
+        'recent_hires': list(recent_hires),
+        # The first departments, in the shape the dashboard chart iterates over
+        'employees_by_dept': [
+            {'name': name, 'count': count} for name, count in list(by_department.items())[:5]
+        ],
+    }
+
+
+def get_dashboard_stats():
+    """Dashboard stats from the cache, recomputed at most once per timeout"""
+    return cache.get_or_set(DASHBOARD_STATS_CACHE_KEY, compute_dashboard_stats, DASHBOARD_STATS_TIMEOUT)
+
+
+def invalidate_dashboard_stats():
+    """Drop the cached dashboard stats and fragments so the next request recomputes them"""
+    cache.delete_many([DASHBOARD_STATS_CACHE_KEY] + [
+        make_template_fragment_key(fragment) for fragment in DASHBOARD_FRAGMENTS
+    ])
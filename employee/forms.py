@@ -1,8 +1,39 @@
 from django import forms
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from .models import Employee, Department, Position, LeaveRequest, Attendance
 
 
+# Shared attrs for Bootstrap styled widgets (widgets copy the attrs they are given)
+FORM_CONTROL = {'class': 'form-control'}
+
+
+class DateFormControl(forms.DateInput):
+    """Bootstrap styled HTML5 date input"""
+    input_type = 'date'
+    
+    def __init__(self, attrs=None, format=None):
+        super().__init__({**FORM_CONTROL, **(attrs or {})}, format)
+
+
+class TimeFormControl(forms.TimeInput):
+    """Bootstrap styled HTML5 time input"""
+    input_type = 'time'
+    
+    def __init__(self, attrs=None, format=None):
+        super().__init__({**FORM_CONTROL, **(attrs or {})}, format)
+
+
+DEPARTMENT_CHOICES_CACHE_KEY = 'dept_choices_active'
+
+
+def active_department_choices():
+    """Build (id, name) choices for active departments"""
+    return [('', 'All Departments')] + list(
+        Department.objects.filter(is_active=True).values_list('id', 'name')
+    )
+
+
 class EmployeeForm(forms.ModelForm):
     """Enhanced form for Employee model"""
     
@@ -23,23 +54,23 @@ class EmployeeForm(forms.ModelForm):
             'last_name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Last Name'}),
             'email': forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'email@example.com'}),
             'phone': forms.TextInput(attrs={'class': 'form-control', 'placeholder': '+1234567890'}),
-            'date_of_birth': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'gender': forms.Select(attrs={'class': 'form-control'}),
-            'photo': forms.FileInput(attrs={'class': 'form-control'}),
+            'date_of_birth': DateFormControl(),
+            'gender': forms.Select(attrs=FORM_CONTROL),
+            'photo': forms.FileInput(attrs=FORM_CONTROL),
             'address_line1': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Street Address'}),
             'address_line2': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Apt, Suite, etc.'}),
             'city': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'City'}),
             'state': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'State'}),
             'postal_code': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Postal Code'}),
             'country': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Country'}),
-            'department': forms.Select(attrs={'class': 'form-control'}),
-            'position': forms.Select(attrs={'class': 'form-control'}),
-            'employment_type': forms.Select(attrs={'class': 'form-control'}),
-            'status': forms.Select(attrs={'class': 'form-control'}),
-            'date_joined': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'date_left': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'department': forms.Select(attrs=FORM_CONTROL),
+            'position': forms.Select(attrs=FORM_CONTROL),
+            'employment_type': forms.Select(attrs=FORM_CONTROL),
+            'status': forms.Select(attrs=FORM_CONTROL),
+            'date_joined': DateFormControl(),
+            'date_left': DateFormControl(),
             'salary': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': '50000.00'}),
-            'manager': forms.Select(attrs={'class': 'form-control'}),
+            'manager': forms.Select(attrs=FORM_CONTROL),
             'emergency_contact_name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Emergency Contact Name'}),
             'emergency_contact_phone': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Emergency Phone'}),
             'emergency_contact_relationship': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Relationship'}),
@@ -79,7 +110,7 @@ class DepartmentForm(forms.ModelForm):
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Department Name'}),
             'code': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'DEPT'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
-            'manager': forms.Select(attrs={'class': 'form-control'}),
+            'manager': forms.Select(attrs=FORM_CONTROL),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
 
@@ -105,10 +136,10 @@ class LeaveRequestForm(forms.ModelForm):
         model = LeaveRequest
         fields = ['employee', 'leave_type', 'start_date', 'end_date', 'reason']
         widgets = {
-            'employee': forms.Select(attrs={'class': 'form-control'}),
-            'leave_type': forms.Select(attrs={'class': 'form-control'}),
-            'start_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'end_date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+            'employee': forms.Select(attrs=FORM_CONTROL),
+            'leave_type': forms.Select(attrs=FORM_CONTROL),
+            'start_date': DateFormControl(),
+            'end_date': DateFormControl(),
             'reason': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'placeholder': 'Reason for leave...'}),
         }
     
@@ -130,11 +161,11 @@ class AttendanceForm(forms.ModelForm):
         model = Attendance
         fields = ['employee', 'date', 'check_in', 'check_out', 'status', 'notes']
         widgets = {
-            'employee': forms.Select(attrs={'class': 'form-control'}),
-            'date': forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
-            'check_in': forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'}),
-            'check_out': forms.TimeInput(attrs={'class': 'form-control', 'type': 'time'}),
-            'status': forms.Select(attrs={'class': 'form-control'}),
+            'employee': forms.Select(attrs=FORM_CONTROL),
+            'date': DateFormControl(),
+            'check_in': TimeFormControl(),
+            'check_out': TimeFormControl(),
+            'status': forms.Select(attrs=FORM_CONTROL),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
         }
 
@@ -148,25 +179,29 @@ class EmployeeSearchForm(forms.Form):
             'placeholder': 'Search by name, email, or employee ID...'
         })
     )
-    department = forms.ModelChoiceField(
-        queryset=Department.objects.filter(is_active=True),
+    department = forms.ChoiceField(
         required=False,
-        widget=forms.Select(attrs={'class': 'form-control'}),
-        empty_label='All Departments'
+        widget=forms.Select(attrs=FORM_CONTROL)
     )
     position = forms.ModelChoiceField(
         queryset=Position.objects.all(),
         required=False,
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=forms.Select(attrs=FORM_CONTROL),
         empty_label='All Positions'
     )
     status = forms.ChoiceField(
         choices=[('', 'All Status')] + Employee.STATUS_CHOICES,
         required=False,
-        widget=forms.Select(attrs={'class': 'form-control'})
+        widget=forms.Select(attrs=FORM_CONTROL)
     )
     employment_type = forms.ChoiceField(
         choices=[('', 'All Types')] + Employee.EMPLOYMENT_TYPE_CHOICES,
         required=False,
-        widget=forms.Select(attrs={'class': 'form-control'})
+        widget=forms.Select(attrs=FORM_CONTROL)
     )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['department'].choices = cache.get_or_set(
+            DEPARTMENT_CHOICES_CACHE_KEY, active_department_choices, 300
+        )
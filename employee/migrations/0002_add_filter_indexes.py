@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-14 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["department", "status"], name="employee_em_departm_6554b8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["date_joined"], name="employee_em_date_jo_14c646_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leaverequest",
+            index=models.Index(
+                fields=["status", "start_date"], name="employee_le_status_23ac40_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-14 08:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0002_add_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["employee", "date"],
+                include=("status",),
+                name="att_emp_date_inc",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["date", "status"], name="employee_at_date_c7626a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="leaverequest",
+            index=models.Index(
+                fields=["employee", "status", "start_date"],
+                name="employee_le_employe_bc700b_idx",
+            ),
+        ),
+    ]
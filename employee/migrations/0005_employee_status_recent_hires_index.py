@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-14 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0004_employee_fullname_trgm"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["status", "-date_joined"], name="employee_em_status_5b77a5_idx"
+            ),
+        ),
+    ]
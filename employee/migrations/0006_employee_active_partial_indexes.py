@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-14 08:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0005_employee_status_recent_hires_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["department"],
+                name="employee_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                condition=models.Q(("status", "active")),
+                fields=["manager"],
+                name="employee_active_manager_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-14 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0006_employee_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["status", "employment_type"],
+                name="employee_em_status_537aa4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="employee",
+            index=models.Index(
+                fields=["last_name", "first_name"],
+                name="employee_em_last_na_9f0101_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Django compiles icontains to UPPER(column::text) LIKE UPPER(%s) on
+# PostgreSQL, so the trigram indexes are built on that same expression
+TRIGRAM_COLUMNS = ["employee_id", "first_name", "last_name", "email"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS employee_{column}_trgm ON employee_employee "
+            f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in TRIGRAM_COLUMNS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS employee_{column}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0007_employee_list_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
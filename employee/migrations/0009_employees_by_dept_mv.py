@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-14 08:26
+
+from django.db import migrations, models
+
+# Active employees per active department. The unique index on id lets the view
+# be refreshed CONCURRENTLY without blocking dashboard reads.
+CREATE_VIEW_SQL = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS employees_by_dept_mv AS
+    SELECT d.id, d.name, COUNT(e.id) FILTER (WHERE e.status = 'active') AS count
+    FROM employee_department d
+    LEFT JOIN employee_employee e ON e.department_id = d.id
+    WHERE d.is_active
+    GROUP BY d.id, d.name
+"""
+
+
+def create_view(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_VIEW_SQL)
+    schema_editor.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS employees_by_dept_mv_id "
+        "ON employees_by_dept_mv (id)"
+    )
+
+
+def drop_view(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP MATERIALIZED VIEW IF EXISTS employees_by_dept_mv")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0008_employee_search_trgm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DepartmentEmployeeCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("count", models.IntegerField()),
+            ],
+            options={
+                "db_table": "employees_by_dept_mv",
+                "ordering": ["name"],
+                "managed": False,
+            },
+        ),
+        migrations.RunPython(create_view, drop_view),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# INCLUDE is PostgreSQL only; elsewhere the index would duplicate the
+# unique_together (employee, date) index
+CREATE_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS att_emp_date_inc ON employee_attendance "
+    "(employee_id, date) INCLUDE (status)"
+)
+
+
+def create_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_INDEX_SQL)
+
+
+def drop_covering_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS att_emp_date_inc")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("employee", "0009_employees_by_dept_mv"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="attendance",
+            name="att_emp_date_inc",
+        ),
+        migrations.RunPython(create_covering_index, drop_covering_index),
+    ]
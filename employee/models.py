@@ -1,15 +1,77 @@
 from django.db import models
+from django.db.models.functions import Coalesce, ExtractDay, ExtractMonth, ExtractYear
+from django.db.models.lookups import LessThan
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 from django.utils import timezone
-import os
+from functools import cached_property
 
 
 def employee_photo_path(instance, filename):
     """Generate file path for employee photo"""
-    ext = filename.split('.')[-1]
-    filename = f'employee_{instance.employee_id}.{ext}'
-    return os.path.join('employee_photos', filename)
+    _, dot, ext = filename.rpartition('.')
+    ext = ext.lower() if dot and ext else 'bin'
+    return f'employee_photos/employee_{instance.employee_id}.{ext}'
+
+
+def _clear_cached_properties(instance, names):
+    """Forget cached_property values so they follow the instance's current fields"""
+    for name in names:
+        instance.__dict__.pop(name, None)
+
+
+def full_name_expression():
+    """SQL for "first_name last_name", matching the employee_fullname_trgm index"""
+    return models.Func(
+        models.F('first_name'), models.Value(' '), models.F('last_name'),
+        template='(%(expressions)s)', arg_joiner=' || ',
+        output_field=models.CharField(),
+    )
+
+
+def active_employee_count(field):
+    """Correlated count of active employees whose `field` is the outer row"""
+    return Coalesce(models.Subquery(
+        Employee.objects.filter(**{field: models.OuterRef('pk')}, status='active').order_by().values(field).annotate(
+            count=models.Count('*')
+        ).values('count')
+    ), 0)
+
+
+def _whole_years(start, end):
+    """SQL for the number of whole calendar years from start to end"""
+    def month_day(date):
+        return ExtractMonth(date) * 100 + ExtractDay(date)
+    
+    return ExtractYear(end) - ExtractYear(start) - models.Case(
+        models.When(LessThan(month_day(end), month_day(start)), then=1),
+        default=0,
+        output_field=models.IntegerField(),
+    )
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """QuerySet with SQL versions of the derived Employee properties"""
+    
+    # Each lookup is served by a pg_trgm index on PostgreSQL (migrations 0004, 0008)
+    SEARCH_LOOKUPS = ('employee_id__icontains', 'search_name__icontains', 'email__icontains')
+    
+    def search(self, term):
+        """Employees whose id, full name or email contains term"""
+        condition = models.Q()
+        for lookup in self.SEARCH_LOOKUPS:
+            condition |= models.Q(**{lookup: term})
+        return self.annotate(search_name=full_name_expression()).filter(condition)
+    
+    def with_derived(self):
+        """Annotate age and years_of_service so they can be sorted and filtered on"""
+        today = models.Value(timezone.now().date(), output_field=models.DateField())
+        return self.annotate(
+            age=_whole_years('date_of_birth', today),
+            years_of_service=_whole_years(
+                'date_joined', Coalesce('date_left', today, output_field=models.DateField())
+            ),
+        )
 
 
 class Department(models.Model):
@@ -118,24 +180,38 @@ class Employee(models.Model):
     # Additional Information
     notes = models.TextField(blank=True)
     
-    @property
+    objects = EmployeeQuerySet.as_manager()
+    
+    # Derived values cached per instance (with_derived() fills age and years_of_service)
+    CACHED_PROPERTIES = ('full_name', 'age', 'years_of_service')
+    
+    @cached_property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
     
-    @property
+    @cached_property
     def age(self):
         if self.date_of_birth:
             today = timezone.now().date()
             return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
         return None
     
-    @property
+    @cached_property
     def years_of_service(self):
         if self.date_joined:
+            # Whole calendar years, as counted by EmployeeQuerySet.with_derived()
             end_date = self.date_left if self.date_left else timezone.now().date()
-            return (end_date - self.date_joined).days // 365
+            return end_date.year - self.date_joined.year - ((end_date.month, end_date.day) < (self.date_joined.month, self.date_joined.day))
         return 0
     
+    def save(self, *args, **kwargs):
+        _clear_cached_properties(self, self.CACHED_PROPERTIES)
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        _clear_cached_properties(self, self.CACHED_PROPERTIES)
+        super().refresh_from_db(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.employee_id} - {self.full_name}"
     
@@ -146,6 +222,14 @@ class Employee(models.Model):
         indexes = [
             models.Index(fields=['employee_id', 'email']),
             models.Index(fields=['status', 'department']),
+            models.Index(fields=['department', 'status']),
+            models.Index(fields=['date_joined']),
+            models.Index(fields=['status', '-date_joined']),
+            models.Index(fields=['status', 'employment_type']),
+            models.Index(fields=['last_name', 'first_name']),
+            # Partial indexes for the per-department and per-manager active counts
+            models.Index(name='employee_active_idx', fields=['department'], condition=models.Q(status='active')),
+            models.Index(name='employee_active_manager_idx', fields=['manager'], condition=models.Q(status='active')),
         ]
 
 
@@ -175,6 +259,22 @@ class EmployeeDocument(models.Model):
         ordering = ['-uploaded_at']
 
 
+class AttendanceManager(models.Manager):
+    """Manager with bulk upsert support for attendance imports"""
+    
+    UPSERT_FIELDS = ['check_in', 'check_out', 'status', 'notes', 'updated_at']
+    
+    def bulk_upsert(self, records, update_fields=None, batch_size=5000):
+        """Insert records, updating the existing row for the same employee and date"""
+        return self.bulk_create(
+            records,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['employee', 'date'],
+            update_fields=update_fields or self.UPSERT_FIELDS
+        )
+
+
 class Attendance(models.Model):
     """Track employee attendance"""
     
@@ -195,6 +295,8 @@ class Attendance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AttendanceManager()
+    
     def __str__(self):
         return f"{self.employee.full_name} - {self.date}"
     
@@ -202,6 +304,9 @@ class Attendance(models.Model):
         ordering = ['-date']
         unique_together = ['employee', 'date']
         verbose_name_plural = 'Attendance Records'
+        indexes = [
+            models.Index(fields=['date', 'status']),
+        ]
 
 
 class LeaveRequest(models.Model):
@@ -235,10 +340,20 @@ class LeaveRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
-    @property
+    CACHED_PROPERTIES = ('total_days',)
+    
+    @cached_property
     def total_days(self):
         return (self.end_date - self.start_date).days + 1
     
+    def save(self, *args, **kwargs):
+        _clear_cached_properties(self, self.CACHED_PROPERTIES)
+        super().save(*args, **kwargs)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        _clear_cached_properties(self, self.CACHED_PROPERTIES)
+        super().refresh_from_db(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.employee.full_name} - {self.leave_type} ({self.start_date} to {self.end_date})"
     
@@ -246,3 +361,22 @@ class LeaveRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Leave Request'
         verbose_name_plural = 'Leave Requests'
+        indexes = [
+            models.Index(fields=['status', 'start_date']),
+            models.Index(fields=['employee', 'status', 'start_date']),
+        ]
+
+
+class DepartmentEmployeeCount(models.Model):
+    """Active employees per active department, read from the employees_by_dept_mv
+    materialized view on PostgreSQL (see migration 0009)"""
+    name = models.CharField(max_length=100)
+    count = models.IntegerField()
+    
+    def __str__(self):
+        return f"{self.name}: {self.count}"
+    
+    class Meta:
+        managed = False
+        db_table = 'employees_by_dept_mv'
+        ordering = ['name']
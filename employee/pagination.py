@@ -0,0 +1,126 @@
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """
+    Page number pagination shared by the API ViewSets.
+    Querysets are sliced to a single page before related rows are prefetched.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class AnnotationFreePaginator(Paginator):
+    """
+    Paginator whose count query drops annotations and ordering.
+    Row-level annotations don't change the number of rows, so computing
+    them only makes the COUNT query slower. Aggregate annotations group
+    the rows and are left untouched.
+    """
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+        queryset = queryset.order_by()
+        annotations = queryset.query.annotations
+        if not any(annotation.contains_aggregate for annotation in annotations.values()):
+            annotations.clear()
+        return queryset.count()
+
+
+class AnnotationFreePagination(StandardResultsSetPagination):
+    """Standard pagination using AnnotationFreePaginator for the total count"""
+    django_paginator_class = AnnotationFreePaginator
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated queryset for the HTML views.
+    Pages are addressed by ?after=/?before= cursors holding the key of the
+    last/first row shown, so no COUNT or OFFSET query is needed.
+    """
+    
+    def __init__(self, object_list, params, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self._params = params
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def has_next(self):
+        return self.next_cursor is not None
+    
+    def has_previous(self):
+        return self.previous_cursor is not None
+    
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+    
+    def _query(self, **cursor):
+        params = self._params.copy()
+        params.update(cursor)
+        return params.urlencode()
+    
+    def first_query(self):
+        return self._query()
+    
+    def next_query(self):
+        return self._query(after=self.next_cursor)
+    
+    def previous_query(self):
+        return self._query(before=self.previous_cursor)
+
+
+def keyset_paginate(request, queryset, key, per_page):
+    """
+    Return the KeysetPage of queryset, ordered on the unique field `key`
+    ('-field' for descending), selected by the request's cursor.
+    """
+    field = key.lstrip('-')
+    descending = key.startswith('-')
+    params = request.GET.copy()
+    for name in ('after', 'before', 'page'):
+        params.pop(name, None)
+    
+    before = request.GET.get('before')
+    after = None if before else request.GET.get('after')
+    rows = queryset.order_by(key)
+    if before or after:
+        # Walking backwards from `before` flips the comparison and the ordering
+        backwards = bool(before)
+        lookup = 'lt' if descending != backwards else 'gt'
+        try:
+            rows = queryset.order_by(f'-{field}' if descending != backwards else field).filter(
+                **{f'{field}__{lookup}': before or after}
+            )
+        except (ValueError, ValidationError):
+            # Malformed cursor, start from the first page
+            before = after = None
+    backwards = bool(before)
+    rows = list(rows[:per_page + 1])
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = bool(rows), more
+    else:
+        has_next, has_previous = more, bool(after)
+    
+    return KeysetPage(
+        rows, params,
+        next_cursor=getattr(rows[-1], field) if has_next and rows else None,
+        previous_cursor=getattr(rows[0], field) if has_previous and rows else None,
+    )
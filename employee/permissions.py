@@ -1,5 +1,45 @@
+from django.core.exceptions import FieldDoesNotExist
 from rest_framework import permissions
 
+from .models import Employee
+
+
+def group_names(request):
+    """Names of the user's groups, fetched once per request"""
+    if not hasattr(request, '_group_names'):
+        request._group_names = frozenset(request.user.groups.values_list('name', flat=True))
+    return request._group_names
+
+
+def is_hr(request):
+    """Whether the user is staff or in the HR group"""
+    return request.user.is_staff or 'HR' in group_names(request)
+
+
+def employee_profile(request):
+    """The user's Employee record or None, looked up once per request"""
+    if not hasattr(request, '_employee_profile'):
+        request._employee_profile = getattr(request.user, 'employee_profile', None)
+    return request._employee_profile
+
+
+def subordinate_ids(request, employee):
+    """Ids of the employee's direct reports, fetched once per request"""
+    if not hasattr(request, '_subordinate_ids'):
+        request._subordinate_ids = frozenset(
+            Employee.objects.filter(manager=employee).values_list('id', flat=True)
+        )
+    return request._subordinate_ids
+
+
+def _employee_fk_id(obj):
+    """Id of the Employee an object belongs to, read without fetching it"""
+    try:
+        field = obj._meta.get_field('employee')
+    except (AttributeError, FieldDoesNotExist):
+        return None
+    return getattr(obj, field.attname)
+
 
 class IsHROrReadOnly(permissions.BasePermission):
     """
@@ -12,10 +52,7 @@ class IsHROrReadOnly(permissions.BasePermission):
             return request.user and request.user.is_authenticated
         
         # Write permissions are only allowed to HR staff
-        return request.user and request.user.is_authenticated and (
-            request.user.is_staff or 
-            request.user.groups.filter(name='HR').exists()
-        )
+        return request.user and request.user.is_authenticated and is_hr(request)
 
 
 class IsManagerOrHR(permissions.BasePermission):
@@ -28,21 +65,25 @@ class IsManagerOrHR(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # HR and staff have full access
-        if request.user.is_staff or request.user.groups.filter(name='HR').exists():
+        if is_hr(request):
             return True
         
-        # Managers can access their subordinates
-        if hasattr(request.user, 'employee_profile'):
-            employee = request.user.employee_profile
-            if hasattr(obj, 'manager') and obj.manager == employee:
+        # Compare FK ids so checking a page of objects doesn't fetch related rows
+        employee = employee_profile(request)
+        owner_id = _employee_fk_id(obj)
+        if employee is not None:
+            # Managers can access their subordinates
+            if getattr(obj, 'manager_id', None) == employee.id:
+                return True
+            if owner_id is not None and owner_id in subordinate_ids(request, employee):
                 return True
-            if hasattr(obj, 'employee') and obj.employee.manager == employee:
+            
+            # Users can access their own data
+            if owner_id == employee.id:
                 return True
         
-        # Users can access their own data
-        if hasattr(obj, 'user') and obj.user == request.user:
-            return True
-        if hasattr(obj, 'employee') and hasattr(obj.employee, 'user') and obj.employee.user == request.user:
+        user_id = getattr(obj, 'user_id', None)
+        if user_id is not None and user_id == request.user.id:
             return True
         
         return False
@@ -55,7 +96,7 @@ class IsOwnerOrHR(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # HR and staff have full access
-        if request.user.is_staff or request.user.groups.filter(name='HR').exists():
+        if is_hr(request):
             return True
         
         # Users can only edit their own profile
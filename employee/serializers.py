@@ -1,9 +1,28 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Prefetch, Q, Value
+from django.db.models.functions import Concat
 from drf_spectacular.utils import extend_schema_field
 from .models import Employee, Department, Position, EmployeeDocument, Attendance, LeaveRequest
 
 
+def _manager_name(obj):
+    """Manager's name from the joined name columns, None when there is no manager"""
+    # Reading the relation (not manager_id) marks a joined NULL manager as used
+    manager = obj.manager
+    if manager is None:
+        return None
+    return f'{manager.first_name} {manager.last_name}'
+
+
+def _active_count(obj, annotation, related_name):
+    """Active employee count from the ViewSet annotation, or a COUNT query for saved instances"""
+    count = getattr(obj, annotation, None)
+    if count is None:
+        count = getattr(obj, related_name).filter(status='active').count()
+    return count
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
@@ -14,7 +33,7 @@ class UserSerializer(serializers.ModelSerializer):
 
 class DepartmentSerializer(serializers.ModelSerializer):
     """Serializer for Department model"""
-    manager_name = serializers.CharField(source='manager.full_name', read_only=True)
+    manager_name = serializers.SerializerMethodField()
     employee_count = serializers.SerializerMethodField()
     
     class Meta:
@@ -23,9 +42,13 @@ class DepartmentSerializer(serializers.ModelSerializer):
                   'employee_count', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    @extend_schema_field(serializers.CharField(allow_null=True))
+    def get_manager_name(self, obj):
+        return _manager_name(obj)
+    
     @extend_schema_field(serializers.IntegerField)
     def get_employee_count(self, obj) -> int:
-        return obj.employees.filter(status='active').count()
+        return _active_count(obj, 'active_employee_count', 'employees')
 
 
 class PositionSerializer(serializers.ModelSerializer):
@@ -40,28 +63,71 @@ class PositionSerializer(serializers.ModelSerializer):
     
     @extend_schema_field(serializers.IntegerField)
     def get_employee_count(self, obj) -> int:
-        return obj.employees.filter(status='active').count()
+        return _active_count(obj, 'active_employee_count', 'employees')
 
 
-class EmployeeListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for employee lists"""
-    department_name = serializers.CharField(source='department.name', read_only=True)
-    position_title = serializers.CharField(source='position.title', read_only=True)
-    manager_name = serializers.CharField(source='manager.full_name', read_only=True)
+class EmployeeListSerializer(serializers.Serializer):
+    """Lightweight read-only serializer for employee lists"""
+    # Declared for the schema; to_representation reads attributes directly
+    # so a page of rows skips DRF's per-field dispatch
+    id = serializers.IntegerField(read_only=True)
+    employee_id = serializers.CharField(read_only=True)
+    first_name = serializers.CharField(read_only=True)
+    last_name = serializers.CharField(read_only=True)
+    full_name = serializers.CharField(read_only=True)
+    email = serializers.EmailField(read_only=True)
+    phone = serializers.CharField(read_only=True)
+    department_name = serializers.CharField(read_only=True)
+    position_title = serializers.CharField(read_only=True)
+    employment_type = serializers.ChoiceField(choices=Employee.EMPLOYMENT_TYPE_CHOICES, read_only=True)
+    status = serializers.ChoiceField(choices=Employee.STATUS_CHOICES, read_only=True)
+    manager_name = serializers.CharField(read_only=True, allow_null=True)
+    date_joined = serializers.DateField(read_only=True)
     
-    class Meta:
-        model = Employee
-        fields = ['id', 'employee_id', 'first_name', 'last_name', 'full_name', 
-                  'email', 'phone', 'department_name', 'position_title', 
-                  'employment_type', 'status', 'manager_name', 'date_joined']
-        read_only_fields = ['id', 'full_name']
+    def to_representation(self, instance):
+        # Built in SQL by setup_eager_loading; fall back for plain instances
+        full_name = getattr(instance, 'full_name_db', None)
+        if full_name is None:
+            full_name = instance.full_name
+        date_joined = instance.date_joined
+        return {
+            'id': instance.id,
+            'employee_id': instance.employee_id,
+            'first_name': instance.first_name,
+            'last_name': instance.last_name,
+            'full_name': full_name,
+            'email': instance.email,
+            'phone': instance.phone,
+            'department_name': instance.department.name,
+            'position_title': instance.position.title,
+            'employment_type': instance.employment_type,
+            'status': instance.status,
+            'manager_name': _manager_name(instance),
+            'date_joined': date_joined.isoformat() if date_joined is not None else None,
+        }
+    
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join the relations rendered by this serializer, build full_name in SQL
+        and only load the columns that are rendered. Managers are prefetched
+        separately since few distinct rows are shared by the whole page."""
+        return queryset.select_related('department', 'position').prefetch_related(
+            Prefetch('manager', queryset=Employee.objects.only('id', 'first_name', 'last_name').order_by())
+        ).annotate(
+            full_name_db=Concat('first_name', Value(' '), 'last_name')
+        ).only(
+            'id', 'employee_id', 'first_name', 'last_name', 'email', 'phone',
+            'employment_type', 'status', 'date_joined',
+            'department_id', 'position_id', 'manager_id',
+            'department__name', 'position__title'
+        )
 
 
 class EmployeeDetailSerializer(serializers.ModelSerializer):
     """Detailed serializer for employee with all fields"""
     department_name = serializers.CharField(source='department.name', read_only=True)
     position_title = serializers.CharField(source='position.title', read_only=True)
-    manager_name = serializers.CharField(source='manager.full_name', read_only=True)
+    manager_name = serializers.SerializerMethodField()
     age = serializers.IntegerField(read_only=True)
     years_of_service = serializers.IntegerField(read_only=True)
     subordinate_count = serializers.SerializerMethodField()
@@ -71,9 +137,13 @@ class EmployeeDetailSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'full_name', 'age', 'years_of_service']
     
+    @extend_schema_field(serializers.CharField(allow_null=True))
+    def get_manager_name(self, obj):
+        return _manager_name(obj)
+    
     @extend_schema_field(serializers.IntegerField)
     def get_subordinate_count(self, obj) -> int:
-        return obj.subordinates.filter(status='active').count()
+        return _active_count(obj, 'active_subordinate_count', 'subordinates')
 
 
 class EmployeeCreateUpdateSerializer(serializers.ModelSerializer):
@@ -82,23 +152,33 @@ class EmployeeCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Employee
         exclude = ['created_at', 'updated_at', 'created_by']
-    
-    def validate_email(self, value):
-        """Ensure email is unique"""
-        instance = self.instance
-        if Employee.objects.filter(email=value).exclude(pk=instance.pk if instance else None).exists():
-            raise serializers.ValidationError("An employee with this email already exists.")
-        return value
-    
-    def validate_employee_id(self, value):
-        """Ensure employee_id is unique"""
-        instance = self.instance
-        if Employee.objects.filter(employee_id=value).exclude(pk=instance.pk if instance else None).exists():
-            raise serializers.ValidationError("An employee with this ID already exists.")
-        return value
+        # Uniqueness is checked in validate() with one query for both fields
+        extra_kwargs = {
+            'email': {'validators': []},
+            'employee_id': {'validators': []},
+        }
     
     def validate(self, data):
         """Cross-field validation"""
+        lookups = Q()
+        if 'email' in data:
+            lookups |= Q(email=data['email'])
+        if 'employee_id' in data:
+            lookups |= Q(employee_id=data['employee_id'])
+        if lookups:
+            instance = self.instance
+            conflicts = Employee.objects.filter(lookups).exclude(
+                pk=instance.pk if instance else None
+            ).values_list('email', 'employee_id')
+            errors = {}
+            for email, employee_id in conflicts:
+                if email == data.get('email'):
+                    errors['email'] = ["An employee with this email already exists."]
+                if employee_id == data.get('employee_id'):
+                    errors['employee_id'] = ["An employee with this ID already exists."]
+            if errors:
+                raise serializers.ValidationError(errors)
+        
         if data.get('date_left') and data.get('date_joined'):
             if data['date_left'] < data['date_joined']:
                 raise serializers.ValidationError("Date left cannot be before date joined.")
@@ -160,6 +240,17 @@ class LeaveRequestSerializer(serializers.ModelSerializer):
                   'rejection_reason', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at', 'approved_by', 'approval_date']
     
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Join the employee and approver and only load the columns that are rendered"""
+        return queryset.select_related('employee', 'approved_by').only(
+            'id', 'leave_type', 'start_date', 'end_date', 'reason', 'status',
+            'approval_date', 'rejection_reason', 'created_at', 'updated_at',
+            'employee_id', 'approved_by_id',
+            'employee__first_name', 'employee__last_name', 'employee__employee_id',
+            'approved_by__first_name', 'approved_by__last_name'
+        )
+    
     def validate(self, data):
         """Validate leave request dates"""
         if data.get('end_date') and data.get('start_date'):
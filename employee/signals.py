@@ -0,0 +1,29 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_dashboard_stats
+from .forms import DEPARTMENT_CHOICES_CACHE_KEY
+from .models import Employee, Department, LeaveRequest
+from .tasks import queue_employees_by_dept_refresh
+
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=LeaveRequest)
+def clear_dashboard_stats(sender, **kwargs):
+    """Employee, department and leave changes all feed the dashboard counters"""
+    invalidate_dashboard_stats()
+
+
+@receiver([post_save, post_delete], sender=Department)
+def clear_department_choices(sender, **kwargs):
+    """The employee search form caches the active department choices"""
+    cache.delete(DEPARTMENT_CHOICES_CACHE_KEY)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=Department)
+def refresh_employees_by_dept_view(sender, **kwargs):
+    """The dashboard reads its per-department counts from a materialized view on PostgreSQL"""
+    queue_employees_by_dept_refresh()
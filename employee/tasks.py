@@ -0,0 +1,123 @@
+from datetime import timedelta
+from tempfile import NamedTemporaryFile
+
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+from rest_framework.request import Request
+
+from .cache import invalidate_dashboard_stats
+from .models import Employee
+
+
+EXPORT_DIR = 'exports'
+EXPORT_HEADERS = ['Employee ID', 'First Name', 'Last Name', 'Email', 'Phone',
+                  'Department', 'Position', 'Status', 'Date Joined']
+
+# Set while a refresh of employees_by_dept_mv is queued, so a burst of writes queues one
+EMPLOYEES_BY_DEPT_REFRESH_KEY = 'employees_by_dept_refresh_queued'
+EMPLOYEES_BY_DEPT_REFRESH_TIMEOUT = 60
+
+
+def filtered_employees(user, query_string):
+    """Apply EmployeeViewSet's filter, search and ordering params outside a request"""
+    from .api_views import EmployeeViewSet
+    
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.GET = QueryDict(query_string)
+    request = Request(http_request)
+    request.user = user
+    
+    view = EmployeeViewSet(request=request, action='export', format_kwarg=None, args=(), kwargs={})
+    return view.filter_queryset(view.get_queryset())
+
+
+def write_employees_workbook(queryset, fileobj):
+    """Write employees to an Excel file without holding the sheet in memory"""
+    from openpyxl import Workbook
+    
+    # Write-only workbooks stream rows to disk instead of building the sheet in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Employees")
+    ws.append(EXPORT_HEADERS)
+    
+    status_labels = dict(Employee.STATUS_CHOICES)
+    rows = queryset.values_list(
+        'employee_id', 'first_name', 'last_name', 'email', 'phone',
+        'department__name', 'position__title', 'status', 'date_joined'
+    )
+    for (employee_id, first_name, last_name, email, phone,
+         department, position, status_value, date_joined) in rows.iterator(chunk_size=2000):
+        ws.append([
+            employee_id,
+            first_name,
+            last_name,
+            email,
+            phone,
+            department,
+            position,
+            status_labels.get(status_value, status_value),
+            date_joined.strftime('%Y-%m-%d') if date_joined else ''
+        ])
+    
+    wb.save(fileobj)
+
+
+@shared_task(bind=True)
+def export_employees_xlsx(self, user_id, query_string=''):
+    """Export employees matching the API query string to storage"""
+    user = User.objects.get(pk=user_id)
+    queryset = filtered_employees(user, query_string)
+    
+    with NamedTemporaryFile(suffix='.xlsx') as tmp:
+        write_employees_workbook(queryset, tmp)
+        tmp.seek(0)
+        name = default_storage.save(f'{EXPORT_DIR}/employees_{self.request.id}.xlsx', File(tmp))
+    
+    return {'user_id': user_id, 'file': name}
+
+
+@shared_task
+def delete_expired_exports():
+    """Delete export files older than EXPORT_RETENTION_SECONDS"""
+    cutoff = timezone.now() - timedelta(seconds=settings.EXPORT_RETENTION_SECONDS)
+    try:
+        _, files = default_storage.listdir(EXPORT_DIR)
+    except FileNotFoundError:
+        return 0
+    
+    deleted = 0
+    for filename in files:
+        name = f'{EXPORT_DIR}/{filename}'
+        if default_storage.get_modified_time(name) < cutoff:
+            default_storage.delete(name)
+            deleted += 1
+    return deleted
+
+
+@shared_task
+def refresh_employees_by_dept():
+    """Refresh the dashboard's employees_by_dept_mv materialized view"""
+    if connection.vendor != 'postgresql':
+        return
+    # Writes from here on queue another refresh
+    cache.delete(EMPLOYEES_BY_DEPT_REFRESH_KEY)
+    with connection.cursor() as cursor:
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY employees_by_dept_mv")
+    # Stats cached since the write were built from the old view
+    invalidate_dashboard_stats()
+
+
+def queue_employees_by_dept_refresh():
+    """Refresh employees_by_dept_mv in the background once the current transaction commits"""
+    if connection.vendor != 'postgresql':
+        return
+    if cache.add(EMPLOYEES_BY_DEPT_REFRESH_KEY, True, EMPLOYEES_BY_DEPT_REFRESH_TIMEOUT):
+        transaction.on_commit(refresh_employees_by_dept.delay)
@@ -1,3 +1,446 @@
-from django.test import TestCase
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import Length
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import permissions
+from rest_framework.test import APIClient
+
+from .api_views import LeaveRequestViewSet
+from .cache import compute_dashboard_stats, get_dashboard_stats
+from .forms import EmployeeSearchForm
+from .models import Department, Employee, LeaveRequest, Position
+from .pagination import AnnotationFreePaginator, keyset_paginate
+from .permissions import IsManagerOrHR, group_names, is_hr
+from .serializers import EmployeeCreateUpdateSerializer
+from .tasks import filtered_employees, refresh_employees_by_dept
+
+
+def create_employee(employee_id, department, position, **kwargs):
+    """Employee with the required fields filled in from employee_id"""
+    return Employee.objects.create(
+        employee_id=employee_id,
+        first_name=kwargs.pop('first_name', 'First'),
+        last_name=kwargs.pop('last_name', employee_id),
+        email=kwargs.pop('email', f'{employee_id.lower()}@example.com'),
+        department=department,
+        position=position,
+        **kwargs
+    )
+
+
+def create_leave_request(employee, **kwargs):
+    """Pending leave request for employee"""
+    return LeaveRequest.objects.create(
+        employee=employee,
+        leave_type='sick',
+        start_date='2024-01-01',
+        end_date='2024-01-03',
+        reason='Flu',
+        **kwargs
+    )
+
+
+class EmployeeFixtureMixin:
+    """One department and position shared by the test employees"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name='Engineering', code='ENG')
+        cls.position = Position.objects.create(title='Developer')
+
+
+class AnnotationFreePaginatorTests(EmployeeFixtureMixin, TestCase):
+    """The COUNT query skips row annotations but keeps aggregates"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Department.objects.create(name='Sales', code='SAL')
+        for number in range(1, 4):
+            create_employee(f'E{number}', cls.department, cls.position)
+    
+    def test_row_annotations_are_dropped(self):
+        queryset = Employee.objects.annotate(name_length=Length('last_name')).order_by('last_name')
+        paginator = AnnotationFreePaginator(queryset, 2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql']
+        self.assertNotIn('LENGTH', sql.upper())
+        self.assertNotIn('ORDER BY', sql)
+        # The page itself still has the annotation
+        self.assertEqual(paginator.page(1)[0].name_length, 2)
+    
+    def test_aggregate_annotations_are_kept(self):
+        queryset = Department.objects.annotate(employee_total=Count('employees')).order_by('name')
+        self.assertEqual(AnnotationFreePaginator(queryset, 10).count, 2)
+
+
+class DenyObjectPermission(permissions.BasePermission):
+    """Object permission that refuses everything"""
+    
+    def has_object_permission(self, request, view, obj):
+        return False
+
+
+class LeaveRequestDecisionTests(EmployeeFixtureMixin, TestCase):
+    """approve/reject only change pending requests the user may access"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user('hr', password='pw', is_staff=True)
+        cls.employee = create_employee('E1', cls.department, cls.position)
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.leave_request = create_leave_request(self.employee)
+    
+    def url(self, decision):
+        return f'/api/leave-requests/{self.leave_request.pk}/{decision}/'
+    
+    def test_approve_pending(self):
+        response = self.client.post(self.url('approve'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'approved')
+        self.leave_request.refresh_from_db()
+        self.assertEqual(self.leave_request.status, 'approved')
+        self.assertEqual(self.leave_request.approved_by, self.user)
+    
+    def test_second_decision_is_rejected(self):
+        self.client.post(self.url('approve'))
+        response = self.client.post(self.url('reject'), {'rejection_reason': 'Too late'})
+        self.assertEqual(response.status_code, 400)
+        self.leave_request.refresh_from_db()
+        self.assertEqual(self.leave_request.status, 'approved')
+        self.assertEqual(self.leave_request.rejection_reason, '')
+    
+    def test_denied_object_permission_changes_nothing(self):
+        with mock.patch.object(
+            LeaveRequestViewSet, 'permission_classes',
+            [permissions.IsAuthenticated, DenyObjectPermission]
+        ):
+            response = self.client.post(self.url('approve'))
+        self.assertEqual(response.status_code, 403)
+        self.leave_request.refresh_from_db()
+        self.assertEqual(self.leave_request.status, 'pending')
+    
+    def test_decision_clears_dashboard_stats(self):
+        self.assertEqual(get_dashboard_stats()['pending_leave_requests'], 1)
+        self.client.post(self.url('reject'))
+        self.assertEqual(get_dashboard_stats()['pending_leave_requests'], 0)
+
+
+class EmployeeUniquenessValidationTests(EmployeeFixtureMixin, TestCase):
+    """Email and employee ID conflicts are reported together"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.first = create_employee('E1', cls.department, cls.position)
+        cls.second = create_employee('E2', cls.department, cls.position)
+    
+    def data(self, **overrides):
+        data = {
+            'employee_id': 'E3',
+            'first_name': 'New',
+            'last_name': 'Hire',
+            'email': 'e3@example.com',
+            'department': self.department.pk,
+            'position': self.position.pk,
+        }
+        data.update(overrides)
+        return data
+    
+    def test_both_conflicts_are_reported(self):
+        serializer = EmployeeCreateUpdateSerializer(
+            data=self.data(employee_id='E1', email=self.second.email)
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {'email', 'employee_id'})
+    
+    def test_single_conflict(self):
+        serializer = EmployeeCreateUpdateSerializer(data=self.data(email=self.first.email))
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {'email'})
+    
+    def test_unique_values_are_valid(self):
+        serializer = EmployeeCreateUpdateSerializer(data=self.data())
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+    
+    def test_update_keeps_own_values(self):
+        serializer = EmployeeCreateUpdateSerializer(
+            self.first, data={'employee_id': 'E1', 'email': self.first.email}, partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class PermissionTests(EmployeeFixtureMixin, TestCase):
+    """HR and manager checks from permissions.py"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.manager_user = User.objects.create_user('manager')
+        cls.manager = create_employee('M1', cls.department, cls.position, user=cls.manager_user)
+        cls.report = create_employee('E1', cls.department, cls.position, manager=cls.manager)
+        cls.other = create_employee('E2', cls.department, cls.position)
+        cls.hr_user = User.objects.create_user('hr')
+        cls.hr_user.groups.add(Group.objects.create(name='HR'))
+    
+    def request_for(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+    
+    def has_access(self, request, obj):
+        return IsManagerOrHR().has_object_permission(request, None, obj)
+    
+    def test_is_hr(self):
+        self.assertTrue(is_hr(self.request_for(User(username='staff', is_staff=True))))
+        self.assertTrue(is_hr(self.request_for(self.hr_user)))
+        self.assertFalse(is_hr(self.request_for(self.manager_user)))
+    
+    def test_hr_membership_is_looked_up_once_per_request(self):
+        request = self.request_for(self.hr_user)
+        with self.assertNumQueries(1):
+            is_hr(request)
+            is_hr(request)
+    
+    def test_group_names_are_shared_with_is_hr(self):
+        request = self.request_for(self.hr_user)
+        is_hr(request)
+        with self.assertNumQueries(0):
+            self.assertEqual(group_names(request), {'HR'})
+    
+    def test_hr_can_access_anything(self):
+        self.assertTrue(self.has_access(self.request_for(self.hr_user), create_leave_request(self.other)))
+    
+    def test_manager_access(self):
+        request = self.request_for(self.manager_user)
+        self.assertTrue(self.has_access(request, self.report))
+        self.assertTrue(self.has_access(request, create_leave_request(self.report)))
+        self.assertTrue(self.has_access(request, create_leave_request(self.manager)))
+        self.assertFalse(self.has_access(request, self.other))
+        self.assertFalse(self.has_access(request, create_leave_request(self.other)))
+    
+    def test_checks_do_not_fetch_related_rows(self):
+        for employee in (self.report, self.manager, self.other):
+            create_leave_request(employee)
+        leave_requests = list(LeaveRequest.objects.all())
+        request = self.request_for(User.objects.get(pk=self.manager_user.pk))
+        # Groups, employee profile and subordinate ids, whatever the number of objects
+        with self.assertNumQueries(3):
+            results = [self.has_access(request, leave_request) for leave_request in leave_requests]
+        self.assertEqual(results.count(True), 2)
+
+
+class KeysetPaginateTests(EmployeeFixtureMixin, TestCase):
+    """keyset_paginate cursors in both directions"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        for number in range(1, 6):
+            create_employee(f'E{number}', cls.department, cls.position)
+    
+    def paginate(self, key='employee_id', **params):
+        request = RequestFactory().get('/', params)
+        return keyset_paginate(request, Employee.objects.all(), key, 2)
+    
+    def employee_ids(self, page):
+        return [employee.employee_id for employee in page]
+    
+    def test_first_page(self):
+        page = self.paginate()
+        self.assertEqual(self.employee_ids(page), ['E1', 'E2'])
+        self.assertTrue(page.has_next())
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page.next_query(), 'after=E2')
+    
+    def test_after_cursor(self):
+        page = self.paginate(after='E2')
+        self.assertEqual(self.employee_ids(page), ['E3', 'E4'])
+        self.assertEqual(page.next_cursor, 'E4')
+        self.assertEqual(page.previous_cursor, 'E3')
+    
+    def test_last_page(self):
+        page = self.paginate(after='E4')
+        self.assertEqual(self.employee_ids(page), ['E5'])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+    
+    def test_before_cursor(self):
+        page = self.paginate(before='E5')
+        self.assertEqual(self.employee_ids(page), ['E3', 'E4'])
+        self.assertEqual(page.next_cursor, 'E4')
+        self.assertEqual(page.previous_cursor, 'E3')
+    
+    def test_before_cursor_reaching_first_page(self):
+        page = self.paginate(before='E3')
+        self.assertEqual(self.employee_ids(page), ['E1', 'E2'])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+    
+    def test_descending_key(self):
+        ids = list(Employee.objects.order_by('-id').values_list('id', flat=True))
+        first = self.paginate(key='-id')
+        self.assertEqual([employee.id for employee in first], ids[:2])
+        second = self.paginate(key='-id', after=first.next_cursor)
+        self.assertEqual([employee.id for employee in second], ids[2:4])
+        back = self.paginate(key='-id', before=second.previous_cursor)
+        self.assertEqual([employee.id for employee in back], ids[:2])
+        self.assertFalse(back.has_previous())
+    
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        page = self.paginate(key='-id', after='not-a-number')
+        self.assertEqual(len(page), 2)
+        self.assertFalse(page.has_previous())
+        self.assertEqual(page.object_list[0], Employee.objects.order_by('-id').first())
+    
+    def test_other_params_are_kept(self):
+        page = self.paginate(status='active', after='E2', page='3')
+        self.assertEqual(page.next_query(), 'status=active&after=E4')
+        self.assertEqual(page.first_query(), 'status=active')
+
+
+class EmployeeExportQueryTests(EmployeeFixtureMixin, TestCase):
+    """The export task applies the API's filters and ordering"""
+    
+    def test_derived_ordering(self):
+        user = User.objects.create_user('exporter')
+        create_employee('E1', self.department, self.position, date_of_birth='1990-01-01')
+        create_employee('E2', self.department, self.position, date_of_birth='1980-01-01')
+        queryset = filtered_employees(user, 'ordering=-age')
+        self.assertEqual(list(queryset.values_list('employee_id', flat=True)), ['E2', 'E1'])
+
+
+class DashboardStatsTests(EmployeeFixtureMixin, TestCase):
+    """Shared dashboard stats for the HTML page and the API"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user('viewer')
+        cls.employee = create_employee('E1', cls.department, cls.position)
+        create_employee('E2', cls.department, cls.position, status='on_leave')
+        create_leave_request(cls.employee)
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_cache_miss_query_budget(self):
+        # Employee aggregate, departments, employment types, recent hires,
+        # department total and pending leaves, plus the row estimate on PostgreSQL
+        expected = 6
+        if connection.vendor == 'postgresql':
+            expected += 1
+            # The materialized view is otherwise only refreshed by the beat task
+            refresh_employees_by_dept()
+        with self.assertNumQueries(expected):
+            stats = compute_dashboard_stats()
+        self.assertEqual(stats['total_employees'], 2)
+        self.assertEqual(stats['on_leave'], 1)
+        self.assertEqual(stats['employees_by_department'], {'Engineering': 1})
+        self.assertEqual(stats['employees_by_dept'], [{'name': 'Engineering', 'count': 1}])
+    
+    def test_cache_hit_runs_no_queries(self):
+        get_dashboard_stats()
+        with self.assertNumQueries(0):
+            get_dashboard_stats()
+    
+    def test_api_serves_shared_stats_and_sees_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/employees/dashboard_stats/').data['total_employees'], 2)
+        create_employee('E3', self.department, self.position)
+        self.assertEqual(client.get('/api/employees/dashboard_stats/').data['total_employees'], 3)
+
+
+class EmployeeSearchFormTests(EmployeeFixtureMixin, TestCase):
+    """Cached department choices follow department changes"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_new_department_is_a_valid_choice(self):
+        # Builds and caches the department choices
+        EmployeeSearchForm()
+        department = Department.objects.create(name='Sales', code='SAL')
+        form = EmployeeSearchForm({'department': str(department.pk)})
+        self.assertTrue(form.is_valid(), form.errors)
+    
+    def test_deactivated_department_is_not_a_choice(self):
+        EmployeeSearchForm()
+        self.department.is_active = False
+        self.department.save()
+        form = EmployeeSearchForm({'department': str(self.department.pk)})
+        self.assertFalse(form.is_valid())
+
+
+class DerivedPropertyTests(EmployeeFixtureMixin, TestCase):
+    """Derived values follow their fields and match the with_derived() annotations"""
+    
+    def test_save_and_refresh_recompute(self):
+        employee = create_employee('E1', self.department, self.position, first_name='Ann')
+        self.assertEqual(employee.full_name, 'Ann E1')
+        employee.first_name = 'Anna'
+        employee.save()
+        self.assertEqual(employee.full_name, 'Anna E1')
+        Employee.objects.filter(pk=employee.pk).update(last_name='Lee')
+        employee.refresh_from_db()
+        self.assertEqual(employee.full_name, 'Anna Lee')
+    
+    def test_leave_request_total_days(self):
+        leave_request = create_leave_request(create_employee('E1', self.department, self.position))
+        leave_request.refresh_from_db()
+        self.assertEqual(leave_request.total_days, 3)
+        LeaveRequest.objects.filter(pk=leave_request.pk).update(end_date='2024-01-01')
+        leave_request.refresh_from_db()
+        self.assertEqual(leave_request.total_days, 1)
+    
+    def test_with_derived_matches_properties(self):
+        # Leap day starts and the days around each anniversary
+        cases = [
+            ('2020-02-29', '2021-02-28', '2000-02-29'),
+            ('2020-02-29', '2021-03-01', '2000-02-28'),
+            ('2020-02-29', '2024-02-29', '2000-03-01'),
+            ('2019-06-15', '2020-06-14', '1990-06-14'),
+            ('2019-06-15', '2020-06-15', '1990-06-15'),
+            ('2019-06-15', None, '1990-06-16'),
+        ]
+        for index, (date_joined, date_left, date_of_birth) in enumerate(cases):
+            create_employee(
+                f'E{index}', self.department, self.position,
+                date_joined=date_joined, date_left=date_left, date_of_birth=date_of_birth,
+            )
+        now = datetime(2025, 2, 28, 12, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            derived = {
+                employee.pk: (employee.age, employee.years_of_service)
+                for employee in Employee.objects.with_derived()
+            }
+            for employee in Employee.objects.all():
+                self.assertEqual(derived[employee.pk], (employee.age, employee.years_of_service), employee.employee_id)
+        self.assertEqual(
+            [derived[pk][1] for pk in sorted(derived)], [0, 1, 4, 0, 1, 5]
+        )
+        self.assertEqual(
+            [derived[pk][0] for pk in sorted(derived)], [24, 25, 24, 34, 34, 34]
+        )
+    
+    def test_retrieve_ignores_derived_ordering(self):
+        user = User.objects.create_user('viewer')
+        employee = create_employee('E1', self.department, self.position, date_joined='2020-02-29')
+        client = APIClient()
+        client.force_authenticate(user)
+        data = client.get(f'/api/employees/{employee.pk}/?ordering=years_of_service').data
+        self.assertEqual(data['years_of_service'], Employee.objects.get(pk=employee.pk).years_of_service)
@@ -1,51 +1,57 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.http import JsonResponse, HttpResponse
+from django.db.models import Prefetch, Value
+from django.db.models.functions import Concat
+from django.http import Http404, HttpResponse
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from datetime import timedelta
 
-from .models import Employee, Department, Position, LeaveRequest, Attendance
+import orjson
+
+from .models import Employee, Department, Position, LeaveRequest, Attendance, active_employee_count
 from .forms import EmployeeForm, EmployeeSearchForm, DepartmentForm, PositionForm, LeaveRequestForm
+from .cache import get_dashboard_stats, DASHBOARD_STATS_TIMEOUT
+from .pagination import keyset_paginate
+
+EMPLOYEE_STATUS_LABELS = dict(Employee.STATUS_CHOICES)
+
+
+def json_response(data):
+    """JSON response serialized with orjson"""
+    return HttpResponse(orjson.dumps(data), content_type='application/json')
 
 
 @login_required
 def dashboard(request):
     """Dashboard with statistics and overview"""
-    total_employees = Employee.objects.count()
-    active_employees = Employee.objects.filter(status='active').count()
-    on_leave = Employee.objects.filter(status='on_leave').count()
-    total_departments = Department.objects.filter(is_active=True).count()
-    pending_leave_requests = LeaveRequest.objects.filter(status='pending').count()
-    
-    # Employees by department
-    employees_by_dept = Department.objects.filter(is_active=True).annotate(
-        count=Count('employees', filter=Q(employees__status='active'))
-    ).values('name', 'count')[:5]
+    stats = get_dashboard_stats()
     
     # Recent hires (last 30 days)
     thirty_days_ago = timezone.now().date() - timedelta(days=30)
     recent_hires = Employee.objects.filter(
         date_joined__gte=thirty_days_ago
-    ).select_related('department', 'position')[:5]
+    ).select_related('department', 'position').only(
+        'first_name', 'last_name', 'date_joined', 'department_id', 'position_id',
+        'department__name', 'position__title'
+    )[:5]
     
-    # Pending leave requests
-    pending_leaves = LeaveRequest.objects.filter(
+    # Pending leave requests; the sixth row only tells us whether there are more
+    pending = list(LeaveRequest.objects.filter(
         status='pending'
-    ).select_related('employee')[:5]
+    ).select_related('employee')[:6])
+    pending_leaves_has_more = len(pending) > 5
+    if not pending_leaves_has_more:
+        # The short list is the exact, up-to-date count
+        stats = {**stats, 'pending_leave_requests': len(pending)}
     
     context = {
-        'total_employees': total_employees,
-        'active_employees': active_employees,
-        'on_leave': on_leave,
-        'total_departments': total_departments,
-        'pending_leave_requests': pending_leave_requests,
-        'employees_by_dept': employees_by_dept,
+        **stats,
         'recent_hires': recent_hires,
-        'pending_leaves': pending_leaves,
+        'pending_leaves': pending[:5],
+        'pending_leaves_has_more': pending_leaves_has_more,
+        'dashboard_cache_timeout': DASHBOARD_STATS_TIMEOUT,
     }
     
     return render(request, 'employee/dashboard.html', context)
@@ -55,18 +61,17 @@ def dashboard(request):
 def employee_list(request):
     """Display all employees with search and filter"""
     form = EmployeeSearchForm(request.GET)
-    employees = Employee.objects.select_related('department', 'position', 'manager').all()
+    # Only the columns the list template renders
+    employees = Employee.objects.select_related('department', 'position').only(
+        'employee_id', 'first_name', 'last_name', 'email', 'phone', 'status',
+        'department_id', 'position_id', 'department__name', 'position__title'
+    )
     
     # Apply filters
     if form.is_valid():
         search = form.cleaned_data.get('search')
         if search:
-            employees = employees.filter(
-                Q(employee_id__icontains=search) |
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search)
-            )
+            employees = employees.search(search)
         
         department = form.cleaned_data.get('department')
         if department:
@@ -84,10 +89,8 @@ def employee_list(request):
         if employment_type:
             employees = employees.filter(employment_type=employment_type)
     
-    # Pagination
-    paginator = Paginator(employees, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination on the unique employee_id, no COUNT or OFFSET
+    page_obj = keyset_paginate(request, employees, 'employee_id', 10)
     
     context = {
         'form': form,
@@ -102,13 +105,16 @@ def employee_list(request):
 def employee_detail(request, pk):
     """Display detailed employee information"""
     employee = get_object_or_404(
-        Employee.objects.select_related('department', 'position', 'manager'),
+        Employee.objects.select_related('department', 'position', 'manager').prefetch_related(
+            Prefetch(
+                'subordinates',
+                queryset=Employee.objects.filter(status='active').select_related('position'),
+                to_attr='active_subordinates'
+            )
+        ),
         pk=pk
     )
     
-    # Get subordinates
-    subordinates = employee.subordinates.filter(status='active')
-    
     # Get recent attendance
     recent_attendance = employee.attendance_records.all()[:10]
     
@@ -117,7 +123,7 @@ def employee_detail(request, pk):
     
     context = {
         'employee': employee,
-        'subordinates': subordinates,
+        'subordinates': employee.active_subordinates,
         'recent_attendance': recent_attendance,
         'leave_requests': leave_requests,
     }
@@ -156,7 +162,11 @@ def employee_update(request, pk):
     if request.method == 'POST':
         form = EmployeeForm(request.POST, request.FILES, instance=employee)
         if form.is_valid():
-            form.save()
+            # Only write the columns the form actually changed
+            employee = form.save(commit=False)
+            if form.changed_data:
+                employee.save(update_fields=form.changed_data + ['updated_at'])
+            form.save_m2m()
             messages.success(request, f'Employee {employee.full_name} updated successfully!')
             return redirect('employee_detail', pk=employee.pk)
         else:
@@ -190,9 +200,9 @@ def employee_delete(request, pk):
 @login_required
 def department_list(request):
     """List all departments"""
-    departments = Department.objects.annotate(
-        employee_count=Count('employees', filter=Q(employees__status='active'))
-    ).all()
+    departments = Department.objects.select_related('manager').annotate(
+        employee_count=active_employee_count('department')
+    )
     
     return render(request, 'employee/department_list.html', {'departments': departments})
 
@@ -243,8 +253,8 @@ def department_update(request, pk):
 def position_list(request):
     """List all positions"""
     positions = Position.objects.annotate(
-        employee_count=Count('employees', filter=Q(employees__status='active'))
-    ).all()
+        employee_count=active_employee_count('position')
+    )
     
     return render(request, 'employee/position_list.html', {'positions': positions})
 
@@ -294,16 +304,22 @@ def position_update(request, pk):
 @login_required
 def leave_request_list(request):
     """List all leave requests"""
-    leave_requests = LeaveRequest.objects.select_related('employee', 'approved_by').all()
+    # The approver's name is annotated rather than joined; a joined approver
+    # goes unused on pages holding only pending requests
+    leave_requests = LeaveRequest.objects.select_related('employee').annotate(
+        approver_name=Concat('approved_by__first_name', Value(' '), 'approved_by__last_name')
+    ).only(
+        'id', 'leave_type', 'start_date', 'end_date', 'status',
+        'employee_id', 'employee__first_name', 'employee__last_name'
+    )
     
     # Filter by status if provided
     status_filter = request.GET.get('status')
     if status_filter:
         leave_requests = leave_requests.filter(status=status_filter)
     
-    paginator = Paginator(leave_requests, 15)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Newest first by id, the keyset equivalent of the created_at ordering
+    page_obj = keyset_paginate(request, leave_requests, '-id', 15)
     
     return render(request, 'employee/leave_request_list.html', {
         'page_obj': page_obj,
@@ -321,7 +337,7 @@ def leave_request_approve(request, pk):
         leave_request.status = 'approved'
         leave_request.approved_by = request.user
         leave_request.approval_date = timezone.now()
-        leave_request.save()
+        leave_request.save(update_fields=['status', 'approved_by', 'approval_date', 'updated_at'])
         messages.success(request, 'Leave request approved successfully!')
     else:
         messages.error(request, 'Only pending requests can be approved.')
@@ -340,7 +356,7 @@ def leave_request_reject(request, pk):
         leave_request.approved_by = request.user
         leave_request.approval_date = timezone.now()
         leave_request.rejection_reason = request.POST.get('rejection_reason', '')
-        leave_request.save()
+        leave_request.save(update_fields=['status', 'approved_by', 'approval_date', 'rejection_reason', 'updated_at'])
         messages.success(request, 'Leave request rejected.')
     else:
         messages.error(request, 'Only pending requests can be rejected.')
@@ -352,15 +368,20 @@ def leave_request_reject(request, pk):
 @login_required
 def get_employee_data(request, pk):
     """Get employee data as JSON"""
-    employee = get_object_or_404(Employee, pk=pk)
+    row = Employee.objects.filter(pk=pk).values(
+        'id', 'employee_id', 'first_name', 'last_name', 'email', 'phone',
+        'department__name', 'position__title', 'status'
+    ).first()
+    if row is None:
+        raise Http404('No Employee matches the given query.')
     data = {
-        'id': employee.id,
-        'employee_id': employee.employee_id,
-        'full_name': employee.full_name,
-        'email': employee.email,
-        'phone': employee.phone,
-        'department': employee.department.name,
-        'position': employee.position.title,
-        'status': employee.get_status_display(),
+        'id': row['id'],
+        'employee_id': row['employee_id'],
+        'full_name': f"{row['first_name']} {row['last_name']}",
+        'email': row['email'],
+        'phone': row['phone'],
+        'department': row['department__name'],
+        'position': row['position__title'],
+        'status': EMPLOYEE_STATUS_LABELS.get(row['status'], row['status']),
     }
-    return JsonResponse(data)
+    return json_response(data)
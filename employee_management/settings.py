@@ -85,6 +85,23 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# N+1 query detection while developing and in CI
+# Detected N+1 queries raise errors; set NPLUSONE_RAISE=False to only log them
+if DEBUG:
+    try:
+        import nplusone  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        INSTALLED_APPS.append("nplusone.ext.django")
+        MIDDLEWARE.insert(0, "nplusone.ext.django.NPlusOneMiddleware")
+        NPLUSONE_RAISE = config('NPLUSONE_RAISE', default=True, cast=bool)
+        # Known false positives, listed per relation
+        NPLUSONE_WHITELIST = [
+            # employee_detail reads the to_attr list, which nplusone does not track
+            {'label': 'unused_eager_load', 'model': 'employee.Employee', 'field': 'active_subordinates'},
+        ]
+
 ROOT_URLCONF = "employee_management.urls"
 
 TEMPLATES = [
@@ -113,9 +130,58 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Reuse connections across requests instead of reconnecting each time
+        "CONN_MAX_AGE": config('CONN_MAX_AGE', default=60, cast=int),
+        "CONN_HEALTH_CHECKS": True,
+    }
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        }
     }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Celery
+# Without a Redis broker tasks run inline, so exports still work in development
+
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default=REDIS_URL or 'memory://')
+CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default=REDIS_URL or 'cache+memory://')
+CELERY_TASK_ALWAYS_EAGER = config('CELERY_TASK_ALWAYS_EAGER', default=not REDIS_URL, cast=bool)
+CELERY_TASK_STORE_EAGER_RESULT = True
+CELERY_RESULT_EXPIRES = 60 * 60 * 24
+CELERY_BEAT_SCHEDULE = {
+    'refresh-employees-by-dept': {
+        'task': 'employee.tasks.refresh_employees_by_dept',
+        'schedule': config('EMPLOYEES_BY_DEPT_REFRESH_SECONDS', default=300, cast=int),
+    },
+    'delete-expired-exports': {
+        'task': 'employee.tasks.delete_expired_exports',
+        'schedule': 60 * 60,
+    },
 }
 
+# Export files outlive their download link (the task result) by no more than this
+EXPORT_RETENTION_SECONDS = config('EXPORT_RETENTION_SECONDS', default=CELERY_RESULT_EXPIRES, cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
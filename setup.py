@@ -13,6 +13,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_management.settings')
 django.setup()
 
 from django.contrib.auth.models import User, Group
+from django.db import transaction
 from employee.models import Department, Position, Employee
 from django.utils import timezone
 from datetime import timedelta
@@ -39,13 +40,13 @@ def create_departments():
         {'name': 'Operations', 'code': 'OPS', 'description': 'Operations and Logistics'},
     ]
     
-    for dept_data in departments:
-        dept, created = Department.objects.get_or_create(
-            code=dept_data['code'],
-            defaults=dept_data
-        )
-        if created:
-            print(f"  ✓ Created department: {dept.name}")
+    existing = set(Department.objects.filter(
+        code__in=[dept_data['code'] for dept_data in departments]
+    ).values_list('code', flat=True))
+    new_departments = [Department(**dept_data) for dept_data in departments if dept_data['code'] not in existing]
+    Department.objects.bulk_create(new_departments, ignore_conflicts=True, batch_size=500)
+    for dept in new_departments:
+        print(f"  ✓ Created department: {dept.name}")
     
     print("✓ Departments created")
 
@@ -76,13 +77,13 @@ def create_positions():
          'description': 'Manages daily operations'},
     ]
     
-    for pos_data in positions:
-        pos, created = Position.objects.get_or_create(
-            title=pos_data['title'],
-            defaults=pos_data
-        )
-        if created:
-            print(f"  ✓ Created position: {pos.title}")
+    existing = set(Position.objects.filter(
+        title__in=[pos_data['title'] for pos_data in positions]
+    ).values_list('title', flat=True))
+    new_positions = [Position(**pos_data) for pos_data in positions if pos_data['title'] not in existing]
+    Position.objects.bulk_create(new_positions, ignore_conflicts=True, batch_size=500)
+    for pos in new_positions:
+        print(f"  ✓ Created position: {pos.title}")
     
     print("✓ Positions created")
 
@@ -91,16 +92,21 @@ def create_sample_employees():
     """Create sample employees"""
     print("\nCreating sample employees...")
     
-    # Get departments and positions
-    eng_dept = Department.objects.get(code='ENG')
-    hr_dept = Department.objects.get(code='HR')
-    sales_dept = Department.objects.get(code='SALES')
+    # Get departments and positions, one query each
+    departments = Department.objects.in_bulk(['ENG', 'HR', 'SALES'], field_name='code')
+    eng_dept = departments['ENG']
+    hr_dept = departments['HR']
+    sales_dept = departments['SALES']
     
-    eng_manager_pos = Position.objects.get(title='Engineering Manager')
-    senior_eng_pos = Position.objects.get(title='Senior Software Engineer')
-    eng_pos = Position.objects.get(title='Software Engineer')
-    hr_manager_pos = Position.objects.get(title='HR Manager')
-    sales_rep_pos = Position.objects.get(title='Sales Representative')
+    positions = Position.objects.in_bulk([
+        'Engineering Manager', 'Senior Software Engineer', 'Software Engineer',
+        'HR Manager', 'Sales Representative',
+    ], field_name='title')
+    eng_manager_pos = positions['Engineering Manager']
+    senior_eng_pos = positions['Senior Software Engineer']
+    eng_pos = positions['Software Engineer']
+    hr_manager_pos = positions['HR Manager']
+    sales_rep_pos = positions['Sales Representative']
     
     # Create sample employees
     employees = [
@@ -171,23 +177,19 @@ def create_sample_employees():
         },
     ]
     
-    for emp_data in employees:
-        emp, created = Employee.objects.get_or_create(
-            employee_id=emp_data['employee_id'],
-            defaults=emp_data
-        )
-        if created:
-            print(f"  ✓ Created employee: {emp.full_name}")
+    existing = set(Employee.objects.filter(
+        employee_id__in=[emp_data['employee_id'] for emp_data in employees]
+    ).values_list('employee_id', flat=True))
+    new_employees = [Employee(**emp_data) for emp_data in employees if emp_data['employee_id'] not in existing]
+    Employee.objects.bulk_create(new_employees, ignore_conflicts=True, batch_size=500)
+    for emp in new_employees:
+        print(f"  ✓ Created employee: {emp.full_name}")
     
-    # Set manager relationships
-    john = Employee.objects.get(employee_id='EMP001')
-    jane = Employee.objects.get(employee_id='EMP002')
-    charlie = Employee.objects.get(employee_id='EMP005')
-    
-    jane.manager = john
-    jane.save()
-    charlie.manager = john
-    charlie.save()
+    # Set manager relationships: one lookup and one UPDATE
+    john = Employee.objects.in_bulk(['EMP001'], field_name='employee_id')['EMP001']
+    Employee.objects.filter(employee_id__in=['EMP002', 'EMP005']).update(
+        manager=john, updated_at=timezone.now()
+    )
     
     print("✓ Sample employees created")
 
@@ -199,14 +201,17 @@ def main():
     print("=" * 60)
     
     try:
-        create_groups()
-        create_departments()
-        create_positions()
-        
-        # Ask if user wants sample data
+        # Ask up front so the transaction isn't held open at the prompt
         response = input("\nDo you want to create sample employees? (y/n): ")
-        if response.lower() == 'y':
-            create_sample_employees()
+        
+        # One transaction for all seeding, committed once at the end
+        with transaction.atomic():
+            create_groups()
+            create_departments()
+            create_positions()
+            
+            if response.lower() == 'y':
+                create_sample_employees()
         
         print("\n" + "=" * 60)
         print("✓ Setup completed successfully!")